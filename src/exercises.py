@@ -28,7 +28,9 @@ your_favourite_food: SeedType = "I don't have a favourite dish"
 
 customer_specs = generate_data.CustomerSpecs(num_customers=5_000, min_age=12, max_age=80)
 order_specs = generate_data.OrderSpecs(num_orders_per_day=20, start_date=date(2024, 1, 1), end_date=date(2024, 12, 31))
-data_string = generate_data.main(customer_specs=customer_specs, order_specs=order_specs, seed=your_favourite_food)
+data_string = generate_data.main_cached(
+    customer_specs=customer_specs, order_specs=order_specs, seed=your_favourite_food
+)
 
 # Print first 100 characters of the data to see what it looks like, which is something like this:
 # > Martin Adams ,51,M,Monday 01 January 2024,Bald,20;Victor Barnes,28,M,Monday 01 January 2024,Mohawk,40;...
@@ -203,9 +205,12 @@ gender, because they are interested in knowing the average order price per gende
 You may assume that every customer's gender is one of M, F, or X.
 
 For each gender, print in the following format:
-> "Revenue <gender>: <revenue> (<count> clients). Average revenue: €<average_revenue>."
+> "Revenue <gender>: €<revenue> (<count> clients). Average revenue: €<average_revenue>."
 > Example output: Revenue M: €91,252.00 (2356 clients). Average revenue: €38.73.
 
+Tip: you do not need to round the numbers yourself. An f-string can print a number with a thousands separator and 2
+decimals, for example `f"€{1234.5:,.2f}"` prints "€1,234.50".
+
 Extra challenge: try to use only one for-loop to compute the necessary information for all genders.
 """
 header_print("Exercise 4.4")
@@ -247,6 +252,9 @@ Apply the price change of 3.5% on the working class and calculate the new revenu
 
 Print the result in the following format:
 > "Revenue after price change: €<total_revenue_inflation_correction>."
+
+NB: Do not change the prices inside `orders_casted` itself. The following exercises start from the original prices
+again, so changing them here would apply the price change multiple times.
 """
 header_print("Exercise 4.6")
 total_revenue_inflation_correction = ...
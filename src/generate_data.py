@@ -1,14 +1,21 @@
 """Generate fake data for project, simulating a customer base of a hairdresser."""
 
 import datetime
+import hashlib
+import io
+import itertools
+import os
 import random
 from dataclasses import dataclass
+from pathlib import Path
 
 import polars as pl
+from faker import VERSION as FAKER_VERSION
 from faker import Faker
 from faker.typing import SeedType
 
 LOCALES = ["en"]  # Example to add German and Spanish names too: ["en", "de", "es"]
+CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache"
 
 GENDERS: list[str] = ["M", "F", "X"]
 HAIRSTYLES: list[tuple[str, int]] = [
@@ -23,9 +30,11 @@ HAIRSTYLES: list[tuple[str, int]] = [
     ("Undercut", 45),
     ("Wavy", 33),
 ]
+HAIRSTYLE_COSTS: dict[str, int] = dict(HAIRSTYLES)
+HAIRSTYLE_DTYPE = pl.Enum(list(HAIRSTYLE_COSTS))
 
 
-@dataclass
+@dataclass(frozen=True)
 class CustomerSpecs:
     """Specifications for creating customer data.
 
@@ -46,7 +55,7 @@ class CustomerSpecs:
             raise ValueError(f"Minimum age {self.min_age} exceeds maximum age {self.max_age}.")
 
 
-@dataclass
+@dataclass(frozen=True)
 class OrderSpecs:
     """Specifications for creating order data.
 
@@ -65,27 +74,29 @@ class OrderSpecs:
             raise ValueError(f"Start date {self.start_date} exceeds end data {self.end_date}.")
 
 
-def create_customer_data(specs: CustomerSpecs, fake: Faker | None = None, seed: SeedType | None = None) -> pl.DataFrame:
+def create_customer_data(
+    specs: CustomerSpecs, fake: Faker | None = None, rng: random.Random | None = None
+) -> pl.DataFrame:
     """Generate fake customer data.
 
     :param specs: Specifications to generate a customer.
     :param fake: Faker object. If not given, instantiate default Faker.
-    :param seed: Random seed, if desired.
+    :param rng: Random number generator, e.g. seeded for reproducible data. If not given, instantiate an unseeded one.
     :return: Data for the customer base, sorted by name.
     """
     fake = fake or Faker(locale=LOCALES)
+    rng = rng or random.Random()
 
-    if seed:
-        fake.seed_instance(seed)
-        random.seed(seed)
-
-    data_rows = []
+    names: list[str] = []
+    ages: list[int] = []
+    genders: list[str] = []
     names_generated = set()
 
-    for _ in range(specs.num_customers):
-        gender = random.choice(GENDERS)
-        age = random.randint(specs.min_age, specs.max_age)
+    # Draw the gender and age of all customers at once instead of one at a time in the loop
+    drawn_genders = rng.choices(GENDERS, k=specs.num_customers)
+    drawn_ages = rng.choices(range(specs.min_age, specs.max_age + 1), k=specs.num_customers)
 
+    for gender, age in zip(drawn_genders, drawn_ages, strict=True):
         match gender:
             case "M":
                 name = fake.first_name_male()
@@ -96,69 +107,93 @@ def create_customer_data(specs: CustomerSpecs, fake: Faker | None = None, seed:
 
         full_name = f"{name} {fake.last_name()}"
         if full_name in names_generated:
-            continue  # Skip this person, their full name was already created
+            continue  # Skip this person, their full name was already created. This keeps the customer names unique
         names_generated.add(full_name)
 
-        random_float = random.random()
-        if random_float < specs.prob_whitespace_in_name:
-            full_name = f"{full_name} "
-        elif random_float < 2 * specs.prob_whitespace_in_name:
-            # Because we use `elif` instead of `if`, we don't need to put `specs.prob_whitespace_in_name < random_float`
-            full_name = f" {full_name}"
-
-        data_rows.append({"name": full_name, "age": age, "gender": gender})
-
-    df_customers = pl.from_dicts(data_rows)
-    df_customers_deduped = df_customers.unique(subset=["name"])
-
-    if len(df_customers_deduped) != len(df_customers):
-        print("Duplicate names found despite specifying. Dropped duplicate names.")
-    print(f"Final number of generated customers: {len(df_customers_deduped)}")
-
-    return df_customers_deduped.sort(by=["name"])
-
-
-def create_order_data(specs: OrderSpecs, customer_names: list[str], seed: SeedType | None = None) -> pl.DataFrame:
+        names.append(full_name)
+        ages.append(age)
+        genders.append(gender)
+
+    # Add a whitespace after the name of some customers, and in front of the name of some others
+    random_floats = pl.Series([rng.random() for _ in names])
+    df_customers = pl.DataFrame(
+        {"name": names, "age": ages, "gender": genders},
+        schema={"name": pl.String, "age": pl.Int64, "gender": pl.Enum(GENDERS)},
+    ).with_columns(
+        pl.when(random_floats < specs.prob_whitespace_in_name)
+        .then(pl.col("name") + " ")
+        # Like with `elif`, this is only reached when the first condition is false, so no need to check a lower bound
+        .when(random_floats < 2 * specs.prob_whitespace_in_name)
+        .then(" " + pl.col("name"))
+        .otherwise(pl.col("name"))
+        .alias("name")
+    )
+    print(f"Final number of generated customers: {len(df_customers)}")
+
+    return df_customers.sort(by=["name"])
+
+
+def create_order_data(specs: OrderSpecs, customer_names: list[str], rng: random.Random | None = None) -> pl.DataFrame:
     """Create order data.
 
     :param specs: Specifications to generate a customer.
     :param customer_names: Names of customers that could make an order.
-    :param seed: Random seed, if desired.
+    :param rng: Random number generator, e.g. seeded for reproducible data. If not given, instantiate an unseeded one.
     :return: Data for the orders, sorted by date and name.
     """
     if len(customer_names) < specs.num_orders_per_day:
         raise ValueError(f"Need at least {specs.num_orders_per_day} customer names but got {len(customer_names)}")
 
-    if seed:
-        random.seed(seed)
+    rng = rng or random.Random()
 
-    data_rows = []
-    current_date = specs.start_date
+    days = pl.date_range(specs.start_date, specs.end_date, "1d", eager=True)
+    num_days = len(days)
 
-    while current_date <= specs.end_date:
-        new_rows = []
-        not_chosen_names = customer_names.copy()
-        for _ in range(specs.num_orders_per_day):
-            hairstyle, costs = random.choice(HAIRSTYLES)
-            order = {
-                "name": (chosen_name := random.choice(not_chosen_names)),
-                "date": current_date,
-                "hairstyle": hairstyle,
-                "costs": costs,
-            }
-            not_chosen_names.remove(chosen_name)
-            new_rows.append(order)
+    # Every day gets the same number of orders, so repeat each date that many times
+    dates = days.to_frame("date").select(pl.col("date").repeat_by(specs.num_orders_per_day).explode()).to_series()
 
-        data_rows.extend(new_rows)
-        current_date += datetime.timedelta(days=1)
+    # A customer gets at most one haircut per day, so sample the names of each day without replacement
+    names = list(
+        itertools.chain.from_iterable(rng.sample(customer_names, k=specs.num_orders_per_day) for _ in range(num_days))
+    )
+    hairstyles = rng.choices(list(HAIRSTYLE_COSTS), k=len(dates))
 
-    df_orders = pl.from_dicts(data_rows)
-    df_orders_deduped = df_orders.unique(subset=["name", "date"])
+    df_orders = pl.DataFrame(
+        {"name": names, "date": dates, "hairstyle": hairstyles},
+        schema={"name": pl.String, "date": pl.Date, "hairstyle": HAIRSTYLE_DTYPE},
+    ).with_columns(costs=pl.col("hairstyle").replace_strict(HAIRSTYLE_COSTS, return_dtype=pl.Int64))
 
-    if len(df_orders_deduped) != len(df_orders):
-        print(f"Duplicate name/date combinations found. Dropped duplicate rows. Final length: {len(df_orders_deduped)}")
+    return df_orders.sort(by=["date", "name"])
 
-    return df_orders_deduped.sort(by=["date", "name"])
+
+def main_df(
+    customer_specs: CustomerSpecs, order_specs: OrderSpecs, fake: Faker | None = None, seed: SeedType | None = None
+) -> pl.DataFrame:
+    """Generate fake data as a DataFrame.
+
+    :param customer_specs: Specifications to generate a customer.
+    :param order_specs: Specifications to generate an order.
+    :param fake: Faker object. If not given, instantiate default Faker.
+    :param seed: Random seed, if desired.
+    :return: Data with the columns name, age, gender, date, hairstyle and costs, sorted by date and name.
+    """
+    fake = fake or Faker(locale=LOCALES)
+    rng = random.Random()
+
+    # Seed once here, such that the customer and order data share the same random state
+    if seed:
+        fake.seed_instance(seed)
+        rng.seed(seed)
+
+    df_customers = create_customer_data(specs=customer_specs, fake=fake, rng=rng)
+
+    customer_names = df_customers["name"].to_list()
+    df_orders = create_order_data(specs=order_specs, customer_names=customer_names, rng=rng)
+
+    # The orders are already sorted by date and name, so keep their order instead of sorting again after the join
+    df_customers_orders = df_orders.join(df_customers, how="left", on=["name"], maintain_order="left")
+
+    return df_customers_orders.select("name", "age", "gender", "date", "hairstyle", "costs")
 
 
 def main(
@@ -172,38 +207,75 @@ def main(
     :param seed: Random seed, if desired.
     :return: Data string, sorted by date and name. Rows are separated by a semicolon, elements are separated by a comma.
     """
-    fake = fake or Faker(locale=LOCALES)
+    df_customers_orders = main_df(customer_specs=customer_specs, order_specs=order_specs, fake=fake, seed=seed)
 
-    if seed:
-        Faker.seed(seed)
-        random.seed(seed)
+    # Write the rows straight into one buffer, with a semicolon instead of a newline at the end of each row. Never quote
+    # values, since the data string is parsed by simply splitting on the separators
+    buffer = io.StringIO()
+    df_customers_orders.write_csv(
+        buffer,
+        include_header=False,
+        separator=",",
+        line_terminator=";",
+        quote_style="never",
+        date_format="%A %d %B %Y",
+    )
+
+    return buffer.getvalue().removesuffix(";")
+
+
+def main_cached(
+    customer_specs: CustomerSpecs, order_specs: OrderSpecs, seed: SeedType | None = None, cache_dir: Path = CACHE_DIR
+) -> str:
+    """Generate fake data, reusing the data of an earlier run with the same input if available.
+
+    Only seeded runs are cached, because those always generate the same data. The cache key also includes the source of
+    this module and the installed Faker and polars versions, such that changes to the data generation are picked up.
+    Only the most recently generated data is kept, and the cache directory can safely be deleted at any time.
+
+    :param customer_specs: Specifications to generate a customer.
+    :param order_specs: Specifications to generate an order.
+    :param seed: Random seed, if desired. If not given, the data is generated without using the cache.
+    :param cache_dir: Directory to store the cached data in. Defaults to `.cache` in the root of the repository.
+    :return: Data string, in the same format as returned by `main`.
+    """
+    if not seed:
+        return main(customer_specs=customer_specs, order_specs=order_specs, seed=seed)
 
-    df_customers = create_customer_data(specs=customer_specs, fake=fake, seed=seed)
+    key = hashlib.sha256(Path(__file__).read_bytes())
+    key.update(repr((customer_specs, order_specs, seed, FAKER_VERSION, pl.__version__)).encode())
+    cache_file = cache_dir / f"data_{key.hexdigest()[:16]}.txt"
 
-    customer_names = pl.Series(df_customers.select("name")).to_list()
-    df_orders = create_order_data(specs=order_specs, customer_names=customer_names, seed=seed)
+    if cache_file.exists():
+        return cache_file.read_text(encoding="utf-8")
 
-    df_customers_orders = df_orders.join(df_customers, how="left", on=["name"])
-    df_customers_orders = df_customers_orders.sort(by=["date", "name"])
+    data_string = main(customer_specs=customer_specs, order_specs=order_specs, seed=seed)
+    cache_dir.mkdir(parents=True, exist_ok=True)
 
-    data_rows: list[str | int] = []
+    # Write to a temporary file first, such that an interrupted write never leaves a truncated cache file behind
+    temp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+    temp_file.write_text(data_string, encoding="utf-8")
+    temp_file.replace(cache_file)
 
-    for row in df_customers_orders.iter_rows(named=True):
-        date = row["date"].strftime("%A %d %B %Y")
-        data_rows.append(f"{row['name']},{row['age']},{row['gender']},{date},{row['hairstyle']},{row['costs']}")
+    for old_cache_file in cache_dir.glob("data_*.txt"):
+        if old_cache_file != cache_file:
+            old_cache_file.unlink(missing_ok=True)
 
-    return ";".join(data_rows)
+    return data_string
 
 
 if __name__ == "__main__":
     random_seed = "98838658"
     customer_specs = CustomerSpecs(num_customers=10, min_age=12, max_age=80)
-    df_customers = create_customer_data(fake=Faker(), specs=customer_specs, seed=random_seed)
+    fake = Faker()
+    fake.seed_instance(random_seed)
+    rng = random.Random(random_seed)
+    df_customers = create_customer_data(fake=fake, specs=customer_specs, rng=rng)
     print(df_customers)
 
-    customer_names = pl.Series(df_customers.select("name")).to_list()
+    customer_names = df_customers["name"].to_list()
     order_specs = OrderSpecs()
-    df_orders = create_order_data(specs=order_specs, customer_names=customer_names, seed=random_seed)
+    df_orders = create_order_data(specs=order_specs, customer_names=customer_names, rng=rng)
     print(df_orders)
 
     data_string = main(fake=Faker(), customer_specs=customer_specs, order_specs=order_specs, seed=random_seed)
@@ -1,3 +1,13 @@
+import functools
+import sys
+
+
+@functools.lru_cache(maxsize=64)
+def _format_header(header: str) -> str:
+    """Format the provided `header` with an underline of the same length, as printed by `header_print`."""
+    return f"\n{header}\n{'=' * len(header)}\n"
+
+
 def header_print(header: str) -> None:
     """Print the provided `header` in a nice format.
 
@@ -8,4 +18,4 @@ def header_print(header: str) -> None:
 
     :param header: The header to print nicely.
     """
-    print(f"\n{header}\n{'=' * len(header)}")
+    sys.stdout.write(_format_header(header))